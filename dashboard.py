@@ -1,10 +1,19 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import os
+import stat
+import csv
 import time
-from datetime import datetime
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from streamlit_autorefresh import st_autorefresh
+from main import get_recommendations_with_platforms
 import re
 
 # --- Enhanced Styling ---
@@ -162,107 +171,218 @@ div[data-testid="stHorizontalBlock"] > div:nth-child(2) .stButton > button:hover
 
 # --- Constants ---
 REFRESH_INTERVAL = 180  # seconds
-COUNTDOWN_REFRESH = 1
 ALLOWED_LABELS = ["High", "Low"]
+MANUAL_PRIORITY_OPTIONS = ALLOWED_LABELS + [""]
+WRITE_BUFFER_SIZE = 1 << 20  # bytes
+# Columns the dashboard reads from each dataset, with their dtypes.
+# Trip IDs stay Arrow-backed strings instead of one Python object per row.
+# The integer columns are nullable, so one blank cell doesn't fail the whole load.
+TRAIN_COLUMNS = {"Trip_ID": "string[pyarrow]", "Train_Name": "category", "priority": "Int32", "delay": "Int32", "clearance_time": "Int32"}
+PLATFORM_COLUMNS = {"Platform_ID": str, "Line_ID": str, "Is_Available": bool}
+IST = timezone(timedelta(hours=5, minutes=30))  # India has no DST, so a fixed offset is exact
+PLATFORM_NUM_RE = re.compile(r'\d+')
+TEXT_DTYPES = (str, "string[pyarrow]", "category")  # read as strings, never inferred
 
 # --- Auto-refresh ---
-st_autorefresh(interval=COUNTDOWN_REFRESH * 1000, key="countdown_timer")
-if "last_refresh" not in st.session_state:
+# Only the real refresh reruns the script; the countdown ticks client-side.
+refresh_count = st_autorefresh(interval=REFRESH_INTERVAL * 1000, key="auto_refresh")
+if st.session_state.get("refresh_count") != refresh_count:
+    st.session_state.refresh_count = refresh_count
     st.session_state.last_refresh = time.time()
 
 elapsed = time.time() - st.session_state.last_refresh
 remaining = max(0, REFRESH_INTERVAL - int(elapsed))
-if remaining == 0:
-    st.session_state.last_refresh = time.time()
-    st.experimental_rerun()
 
 st.set_page_config(page_title="Train Section Controller", layout="wide")
 st.title("AI Train Section Controller Dashboard")
 
 if st.button("🔄 Refresh Now"):
-    st.session_state.last_refresh = time.time()
-    st.experimental_rerun()
-
-st.caption(f"⏳ Next auto-refresh in *{remaining} seconds*")
-st.write(f"Displaying the schedule for *{pd.Timestamp.now(tz='Asia/Kolkata').strftime('%A, %d %B %Y %I:%M %p IST')}*")
+    st.rerun()
+
+# The snippet carries refresh_count so its markup changes every cycle; identical markup
+# isn't reloaded, which would leave the countdown stuck at 0. The browser counts down
+# against its own clock, so server/browser clock skew doesn't matter.
+components.html(
+    f"""
+<div style="font-family: 'Poppins', sans-serif; font-size: 14px; color: #718096;" data-refresh="{refresh_count}">
+    ⏳ Next auto-refresh in <em><span id="countdown">{remaining}</span> seconds</em>
+</div>
+<script>
+    const deadline = Date.now() + {remaining} * 1000;
+    const counter = document.getElementById("countdown");
+    setInterval(() => {{
+        counter.innerText = Math.max(0, Math.ceil((deadline - Date.now()) / 1000));
+    }}, 1000);
+</script>
+    """,
+    height=30
+)
+st.write(f"Displaying the schedule for *{datetime.now(IST).strftime('%A, %d %B %Y %I:%M %p IST')}*")
 
 # --- Helpers ---
-def safe_int(x, fallback=0):
-    try:
-        return int(x)
-    except Exception:
-        return fallback
+@lru_cache(maxsize=None)
+def platform_sort_key(p):
+    match = PLATFORM_NUM_RE.search(str(p))
+    return int(match.group()) if match else float('inf')
+
+@st.cache_data(ttl=REFRESH_INTERVAL)
+def load_csv(path, mtime, dtype=None, usecols=None):
+    # `mtime` is only part of the cache key, so an edited file is re-parsed
+    # while the countdown reruns reuse the cached DataFrame.
+    # pyarrow is already installed as a streamlit dependency and parses multithreaded.
+    # Text columns are typed as strings in the reader itself: pd.read_csv(engine="pyarrow")
+    # infers first and casts afterwards, which would turn an ID like "001" into "1".
+    dtype = dtype or {}
+    text_columns = {col: pa.string() for col, col_dtype in dtype.items() if col_dtype in TEXT_DTYPES}
+    table = pa_csv.read_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(column_types=text_columns, include_columns=usecols or [])
+    )
+    return table.to_pandas().astype(dtype)
+
+def load_trains(path, mtime):
+    return load_csv(path, mtime, dtype=TRAIN_COLUMNS, usecols=list(TRAIN_COLUMNS))
+
+def load_platforms(path, mtime):
+    return load_csv(path, mtime, dtype=PLATFORM_COLUMNS, usecols=list(PLATFORM_COLUMNS))
 
 def get_platform_queues(trains_df, platforms_df):
     # This is a mock function, as the original was not provided.
     # In a real scenario, this would contain the core logic for assigning trains to platforms.
     # We will simulate some queues based on the provided data.
-    platform_queues = {}
-    for _, platform in platforms_df.iterrows():
-        platform_id = platform["Platform_ID"]
-        # Filter trains based on some criteria, e.g., platform_id in their route
-        # For this example, we'll just distribute them round-robin to a few platforms
-        if platform_id not in platform_queues:
-            platform_queues[platform_id] = []
+    # Filter trains based on some criteria, e.g., platform_id in their route
+    # For this example, we'll just distribute them round-robin to a few platforms
+    platform_queues = {platform_id: [] for platform_id in platforms_df["Platform_ID"]}
 
     # Simple mock distribution of trains
-    trains_list = trains_df.to_dict('records')
-    sorted_trains = sorted(trains_list, key=lambda t: t.get('priority', 0))
+    sorted_trains = trains_df.sort_values('priority', kind='stable')
+
+    # One round-robin slot per platform line, so a platform with two lines gets two turns
+    platforms_with_queues = np.array(sorted(platforms_df["Platform_ID"], key=platform_sort_key), dtype=object)
+    if len(platforms_with_queues):
+        assignment = platforms_with_queues[np.arange(len(sorted_trains)) % len(platforms_with_queues)]
+        for platform_id, queue in sorted_trains.groupby(assignment, sort=False):
+            platform_queues[platform_id] = queue.to_dict('records')
 
-    platforms_with_queues = sorted([p for p in platforms_df["Platform_ID"] if p in platform_queues], key=lambda p: int(re.search(r'\d+', p).group()) if re.search(r'\d+', p) else float('inf'))
-    
-    for i, train in enumerate(sorted_trains):
-        platform_id = platforms_with_queues[i % len(platforms_with_queues)]
-        platform_queues[platform_id].append(train)
-        
     return platform_queues
 
+@st.cache_data(ttl=REFRESH_INTERVAL)
+def load_platform_queues(trains_path, trains_mtime, platforms_path, platforms_mtime):
+    # Keyed on file paths + mtimes rather than the DataFrames, which are slow to hash.
+    return get_platform_queues(
+        load_trains(trains_path, trains_mtime),
+        load_platforms(platforms_path, platforms_mtime)
+    )
+
+def load_overrides(path):
+    # queued_overrides.csv is an append-only log: the last entry for a trip wins,
+    # and a blank Manual Priority clears its override.
+    # Returns a plain {trip_id: label} dict and the number of rows in the log.
+    if not os.path.exists(path):
+        return {}, 0
+    log = load_csv(path, os.path.getmtime(path), dtype={"Trip ID": "string[pyarrow]"})
+    if "Manual Priority" not in log.columns:
+        log["Manual Priority"] = ""
+    # Normalise hand-edited labels (e.g. " High") in one vectorized pass
+    log["Manual Priority"] = log["Manual Priority"].astype(str).str.strip()
+    overrides = log.drop_duplicates(subset="Trip ID", keep="last")
+    overrides = overrides[overrides["Manual Priority"].isin(ALLOWED_LABELS)]
+    return dict(zip(overrides["Trip ID"], overrides["Manual Priority"])), len(log)
+
+def ends_with_newline(path):
+    # Appended rows need the log to end in a newline, or they'd join its last line
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+@st.cache_resource
+def default_file_mode():
+    # The umask can only be read by setting it, so do that once per process
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+@contextmanager
+def open_atomic(path):
+    # Write to a temp file next to `path` and swap it in with os.replace, so a
+    # crash mid-write can't leave a truncated file behind.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", buffering=WRITE_BUFFER_SIZE, newline="") as f:
+            yield f
+        # mkstemp creates the file as 0600; keep the target's permissions (or the
+        # usual umask default for a new file) so other users can still read it
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        else:
+            os.chmod(tmp_path, default_file_mode())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def save_overrides(path, overrides):
+    with open_atomic(path) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["Trip ID", "Manual Priority"])
+        writer.writerows(overrides.items())
+
 # --- Load Data ---
 BASE_DIR = os.getcwd()
 trains_file = os.path.join(BASE_DIR, "trains.csv")
 platforms_file = os.path.join(BASE_DIR, "platform_dataset.csv")
 overrides_file = os.path.join(BASE_DIR, "queued_overrides.csv")
 
-# Create dummy files if they don't exist
-if not os.path.exists(trains_file):
-    dummy_trains = pd.DataFrame({
-        "Trip_ID": [f"T{i:03}" for i in range(1, 21)],
-        "Train_Name": [f"Express-{i}" for i in range(1, 21)],
-        "priority": np.random.randint(1, 10, 20),
-        "delay": np.random.randint(0, 3600, 20),
-        "clearance_time": np.random.randint(10, 100, 20)
-    })
-    dummy_trains.to_csv(trains_file, index=False)
+@st.cache_resource
+def ensure_datasets(trains_path, platforms_path):
+    # Create dummy files if they don't exist; cache_resource runs this once per process
+    if not os.path.exists(trains_path):
+        # Seeded so a regenerated file has the same contents
+        rng = np.random.default_rng(0)
+        dummy_trains = pd.DataFrame({
+            "Trip_ID": [f"T{i:03}" for i in range(1, 21)],
+            "Train_Name": [f"Express-{i}" for i in range(1, 21)],
+            "priority": rng.integers(1, 10, 20, dtype=np.int32),
+            "delay": rng.integers(0, 3600, 20, dtype=np.int32),
+            "clearance_time": rng.integers(10, 100, 20, dtype=np.int32)
+        })
+        dummy_trains.to_csv(trains_path, index=False)
 
-if not os.path.exists(platforms_file):
-    dummy_platforms = pd.DataFrame({
-        "Platform_ID": [f"P{i}" for i in range(1, 11)],
-        "Line_ID": [f"Line-{i}" for i in range(1, 11)],
-        "Is_Available": [True] * 10
-    })
-    dummy_platforms.to_csv(platforms_file, index=False)
+    if not os.path.exists(platforms_path):
+        dummy_platforms = pd.DataFrame({
+            "Platform_ID": [f"P{i}" for i in range(1, 11)],
+            "Line_ID": [f"Line-{i}" for i in range(1, 11)],
+            "Is_Available": [True] * 10
+        })
+        dummy_platforms.to_csv(platforms_path, index=False)
+
+ensure_datasets(trains_file, platforms_file)
 
-df_trains = pd.read_csv(trains_file)
-df_platforms = pd.read_csv(platforms_file)
+trains_mtime = os.path.getmtime(trains_file)
+platforms_mtime = os.path.getmtime(platforms_file)
+df_trains = load_trains(trains_file, trains_mtime)
+df_platforms = load_platforms(platforms_file, platforms_mtime)
 
 # --- Session State ---
 if "platform_original" not in st.session_state:
-    st.session_state.platform_original = df_platforms["Is_Available"].copy()
+    # Kept as a plain array so change detection doesn't align on the index
+    st.session_state.platform_original = df_platforms["Is_Available"].to_numpy(copy=True)
 if "pending_platform" not in st.session_state:
     st.session_state.pending_platform = None
-if "pending_priority_platforms" not in st.session_state:
-    st.session_state.pending_priority_platforms = {}  # key: platform, value: pending changes
 if "platforms_sidebar" not in st.session_state:
-    st.session_state.platforms_sidebar = df_platforms.copy()  # For sidebar editor control
-if "df_overrides" not in st.session_state:
-    if os.path.exists(overrides_file):
-        st.session_state.df_overrides = pd.read_csv(overrides_file, dtype={"Trip ID": str})
-        if "Manual Priority" not in st.session_state.df_overrides.columns:
-            st.session_state.df_overrides["Manual Priority"] = ""
-    else:
-        st.session_state.df_overrides = pd.DataFrame(columns=["Trip ID", "Manual Priority"])
+    # For sidebar editor control; cache_data already returns a fresh copy
+    st.session_state.platforms_sidebar = df_platforms
 if "revert_trigger" not in st.session_state:
-    st.session_state.revert_trigger = 0
+    st.session_state.revert_trigger = 0  # Bumped to give the queue editor a fresh key
+if "overrides" not in st.session_state:
+    overrides, log_rows = load_overrides(overrides_file)
+    st.session_state.overrides = overrides  # key: Trip ID, value: manual priority
+    # Compact the log so it doesn't grow without bound, but only when it has superseded
+    # or cleared rows (or is missing / unterminated); rewriting bumps its mtime.
+    if log_rows != len(overrides) or not ends_with_newline(overrides_file):
+        save_overrides(overrides_file, overrides)
 
 # --- Sidebar ---
 st.sidebar.header("Live Data Preview")
@@ -283,184 +403,184 @@ df_platforms_edit = st.sidebar.data_editor(
 )
 
 # --- Detect platform availability changes ---
-changed_platforms = df_platforms_edit["Is_Available"] != st.session_state.platform_original
+changed_platforms = df_platforms_edit["Is_Available"].to_numpy() != st.session_state.platform_original
 if changed_platforms.any() and st.session_state.pending_platform is None:
-    st.session_state.pending_platform = df_platforms_edit.copy()
+    st.session_state.pending_platform = df_platforms_edit  # data_editor returns a new frame each run
 
 if st.session_state.pending_platform is not None:
     st.warning("⚠ Platform availability changes detected! Apply changes?")
     col1, col2 = st.columns(2)
     if col1.button("Agree - Apply Changes"):
-        st.session_state.pending_platform.to_csv(os.path.join(BASE_DIR, "platform_dataset.csv"), index=False)
-        st.session_state.platform_original = st.session_state.pending_platform["Is_Available"].copy()
+        pending = st.session_state.pending_platform
+        # Only rewrite the file if the toggles don't match what's already saved
+        if not np.array_equal(pending["Is_Available"].to_numpy(), st.session_state.platform_original):
+            with open_atomic(platforms_file) as f:
+                pending.to_csv(f, index=False, lineterminator="\n")
+        st.session_state.platform_original = pending["Is_Available"].to_numpy(copy=True)
+        st.session_state.platforms_sidebar = pending
         st.session_state.pending_platform = None
-        st.session_state.platforms_sidebar = st.session_state.pending_platform.copy()
-        st.experimental_rerun()
+        st.rerun()
     if col2.button("Disagree - Revert Changes"):
         st.session_state.platforms_sidebar["Is_Available"] = st.session_state.platform_original.copy()
         st.session_state.pending_platform = None
-        st.experimental_rerun()
+        st.rerun()
 
 # --- AI Recommendations ---
-def get_recommendations_with_platforms(trains_df, platforms_df):
-    available_lines = platforms_df[platforms_df['Is_Available'] == True].to_dict('records')
-    trains_list = trains_df.to_dict('records')
-    sorted_trains = sorted(trains_list, key=lambda train: (
-        train.get('priority', 0),
-        -train.get('delay', 0),
-        train.get('clearance_time', 0)
-    ))
-    num_suggestions = min(len(sorted_trains), len(available_lines), 10)
-    recommendations = []
-    for i in range(num_suggestions):
-        recommendations.append((sorted_trains[i], available_lines[i]))
-    return recommendations
-
-full_recommendations = get_recommendations_with_platforms(df_trains, df_platforms)
+@st.cache_data(ttl=REFRESH_INTERVAL)
+def load_recommendations(trains_path, trains_mtime, platforms_path, platforms_mtime):
+    return get_recommendations_with_platforms(
+        load_trains(trains_path, trains_mtime),
+        load_platforms(platforms_path, platforms_mtime)
+    )
+
+full_recommendations = load_recommendations(trains_file, trains_mtime, platforms_file, platforms_mtime)
 st.header("Current Train Schedule")
 if full_recommendations:
-    output_data = []
-    for i, (train, platform) in enumerate(full_recommendations):
-        output_data.append({
-            "Rank": i + 1,
-            "Trip ID": train.get('Trip_ID', 'Unknown'),
-            "Priority": train.get('priority', 0),
-            "Delay (s)": train.get('delay', 0),
-            "Suggested Platform": f"{platform.get('Platform_ID', 'N/A')}, {platform.get('Line_ID', 'N/A')}"
-        })
-    df_display = pd.DataFrame(output_data)
+    df_display = pd.DataFrame({
+        "Rank": np.arange(1, len(full_recommendations) + 1),
+        "Trip ID": [train.get('Trip_ID', 'Unknown') for train, _ in full_recommendations],
+        "Priority": pd.array([train.get('priority', 0) for train, _ in full_recommendations], dtype="Int32"),
+        "Delay (s)": pd.array([train.get('delay', 0) for train, _ in full_recommendations], dtype="Int32"),
+        "Suggested Platform": [
+            f"{platform.get('Platform_ID', 'N/A')}, {platform.get('Line_ID', 'N/A')}"
+            for _, platform in full_recommendations
+        ]
+    })
     st.dataframe(df_display.set_index("Rank"))
 else:
     st.info(" No schedule to display.")
 
 # --- Platform Queues ---
-st.header(" Platform Queue Status")
-platform_queues = get_platform_queues(df_trains, df_platforms)
-
-if platform_queues:
-    def platform_sort_key(p):
-        match = re.search(r'\d+', str(p))
-        return int(match.group()) if match else float('inf')
-
-    for platform in sorted(platform_queues.keys(), key=platform_sort_key):
-        queue = platform_queues[platform]
-        st.subheader(f"{platform}")
-        if not queue:
-            st.write("- No trains in queue.")
-            continue
-
-        table_rows = []
-        for i, train in enumerate(queue):
-            status = "Arriving" if i == 0 else "Queued"
-            trip_id = str(train.get("Trip_ID", "N/A"))
-            
-            # Get manual priority from the current state
-            manual_priority = st.session_state.df_overrides[
-                st.session_state.df_overrides["Trip ID"] == trip_id
-            ]["Manual Priority"].iloc[0] if trip_id in st.session_state.df_overrides["Trip ID"].values else ""
-
-            table_rows.append({
-                "Status": status,
-                "Train Name": train.get("Train_Name", "Unknown"),
-                "Trip ID": trip_id,
-                "AI Priority": train.get("priority", 0),
-                "Manual Priority": manual_priority if status == "Queued" else "",
-                "Delay (s)": train.get("delay", 0)
-            })
-
-        df_platform = pd.DataFrame(table_rows)
-
-        # Sorting: Arriving -> High -> AI -> Low
-        def sort_value(row):
-            if row["Status"] == "Arriving":
-                return -1
-            elif row["Manual Priority"] == "High":
-                return 0
-            elif row["Manual Priority"] == "Low":
-                return 9999
-            else:
-                return safe_int(row["AI Priority"], fallback=500) + 10
-
-        df_platform["_SortVal"] = df_platform.apply(sort_value, axis=1)
-        df_sorted = df_platform.sort_values(
-            by=["_SortVal", "Delay (s)"], ascending=[True, False]
-        ).drop(columns=["_SortVal"]).reset_index(drop=True)
-
-        # Add Sr. No
-        df_sorted["Sr. No"] = df_sorted.index
-        cols = ["Sr. No"] + [c for c in df_sorted.columns if c != "Sr. No"]
-        df_sorted = df_sorted[cols]
-
-        # Get a copy for comparison
-        df_before_edit = df_sorted.copy()
-        
-        # We need a dynamic key to force a reset
-        data_editor_key = f"editor_{platform}_{st.session_state.revert_trigger}"
+@st.cache_data(ttl=REFRESH_INTERVAL)
+def build_queue_table(trains_path, trains_mtime, platforms_path, platforms_mtime, overrides):
+    # `overrides` is a tuple of (trip_id, label) pairs so it hashes cheaply; the
+    # table is rebuilt only when a CSV or an override changes.
+    platform_queues = load_platform_queues(trains_path, trains_mtime, platforms_path, platforms_mtime)
+    override_map = dict(overrides)
+    platform_order = sorted(platform_queues.keys(), key=platform_sort_key)
+
+    # Every queue goes into one table; Platform is an ordered categorical so sorting
+    # on it keeps the platforms in display order
+    queued_trains = [(platform, train) for platform in platform_order for train in platform_queues[platform]]
+    df_queues = pd.DataFrame({
+        "Platform": pd.Categorical([platform for platform, _ in queued_trains], categories=platform_order, ordered=True),
+        "Train Name": [train.get("Train_Name", "Unknown") for _, train in queued_trains],
+        "Trip ID": [str(train.get("Trip_ID", "N/A")) for _, train in queued_trains],
+        "AI Priority": pd.array([train.get("priority", 0) for _, train in queued_trains], dtype="Int32"),
+        "Delay (s)": pd.array([train.get("delay", 0) for _, train in queued_trains], dtype="Int32")
+    })
+    # The first train in each queue is arriving, the rest are queued
+    arriving = df_queues.groupby("Platform", sort=False, observed=True).cumcount().to_numpy() == 0
+    df_queues.insert(1, "Status", pd.Categorical.from_codes(np.where(arriving, 0, 1), categories=["Arriving", "Queued"]))
+    # Manual overrides only apply to queued trains
+    manual_priority = df_queues["Trip ID"].map(override_map).fillna("").to_numpy()
+    df_queues.insert(5, "Manual Priority", pd.Categorical(np.where(arriving, "", manual_priority), categories=MANUAL_PRIORITY_OPTIONS))
+
+    # Sorting within each platform: Arriving -> High -> AI -> Low
+    # Comparisons on the categorical column only compare integer codes
+    high = (df_queues["Manual Priority"] == "High").to_numpy()
+    low = (df_queues["Manual Priority"] == "Low").to_numpy()
+    # Trains with a missing priority sort as 500, after every real priority
+    ai_priority = pd.to_numeric(df_queues["AI Priority"], errors="coerce").fillna(500).to_numpy(dtype="int64") + 10
+    df_queues["_SortVal"] = np.select(
+        [arriving, high, low],
+        [-1, 0, 9999],
+        default=ai_priority
+    )
+    df_queues = df_queues.sort_values(
+        by=["Platform", "_SortVal", "Delay (s)"], ascending=[True, True, False], ignore_index=True
+    ).drop(columns=["_SortVal"])
+
+    # Sr. No restarts for each platform
+    df_queues.insert(1, "Sr. No", df_queues.groupby("Platform", sort=False, observed=True).cumcount())
+
+    return platform_order, df_queues
+
+@st.fragment
+def platform_queue_section():
+    # Editing, applying or reverting overrides only reruns this section,
+    # not the CSV loads and recommendations above
+    st.header(" Platform Queue Status")
+    platform_order, df_queues = build_queue_table(
+        trains_file, trains_mtime, platforms_file, platforms_mtime,
+        tuple(sorted(st.session_state.overrides.items()))
+    )
+
+    if platform_order:
+        queued_platforms = set(df_queues["Platform"])
+        idle_platforms = [str(platform) for platform in platform_order if platform not in queued_platforms]
+        if idle_platforms:
+            st.caption(f"No trains in queue: {', '.join(idle_platforms)}")
+
+    if not df_queues.empty:
+        # One editor for every platform. Popping its state doesn't clear the edits the
+        # browser still shows, so Agree/Disagree bump revert_trigger to remount it.
+        data_editor_key = f"queue_editor_{st.session_state.revert_trigger}"
 
         edited_df = st.data_editor(
-            df_sorted,
+            df_queues,
             key=data_editor_key,
+            # Every column is typed up front, so the editor doesn't infer them on each run
             column_config={
+                "Platform": st.column_config.TextColumn("Platform", disabled=True),
+                "Sr. No": st.column_config.NumberColumn("Sr. No", format="%d", disabled=True),
+                "Status": st.column_config.TextColumn("Status", disabled=True),
+                "Train Name": st.column_config.TextColumn("Train Name", disabled=True),
+                "Trip ID": st.column_config.TextColumn("Trip ID", disabled=True),
+                "AI Priority": st.column_config.NumberColumn("AI Priority", format="%d", disabled=True),
                 "Manual Priority": st.column_config.SelectboxColumn(
                     "Manual Priority",
-                    options=["High", "Low", ""],
+                    options=MANUAL_PRIORITY_OPTIONS,
                     help="Set manual override (only for queued trains)"
-                )
+                ),
+                "Delay (s)": st.column_config.NumberColumn("Delay (s)", format="%d", disabled=True)
             },
-            disabled=["Sr. No", "Status", "Train Name", "Trip ID", "AI Priority", "Delay (s)"],
+            column_order=list(df_queues.columns),
             hide_index=True
         )
 
-        # Detect changes per platform
-        edited_priorities = edited_df.set_index("Trip ID")["Manual Priority"].to_dict()
-        original_priorities = df_before_edit.set_index("Trip ID")["Manual Priority"].to_dict()
-        
-        has_changes = False
-        for trip_id in edited_priorities:
-            if edited_priorities[trip_id] != original_priorities[trip_id]:
-                has_changes = True
-                break
-
-        if has_changes and platform not in st.session_state.pending_priority_platforms:
-            st.session_state.pending_priority_platforms[platform] = edited_df.copy()
-
-        # Confirmation alert for this platform
-        if platform in st.session_state.pending_priority_platforms:
-            st.warning(f"⚠ Manual priority changes detected for {platform}! Apply changes?")
+        # Detect changes; the editor keeps the row order of df_queues
+        edited_rows = edited_df["Manual Priority"].to_numpy() != df_queues["Manual Priority"].to_numpy()
+        has_changes = edited_rows.any()
+
+        # Confirmation alert
+        if has_changes:
+            st.warning("⚠ Manual priority changes detected! Apply changes?")
             col1, col2 = st.columns(2)
-            if col1.button(f"Agree - Apply Changes for {platform}"):
-                pending_df = st.session_state.pending_priority_platforms[platform]
-                # Update the main overrides DataFrame
-                for _, row in pending_df.iterrows():
-                    trip_id = row["Trip ID"]
-                    manual_priority = row["Manual Priority"]
-                    
-                    if trip_id in st.session_state.df_overrides["Trip ID"].values:
-                        st.session_state.df_overrides.loc[st.session_state.df_overrides["Trip ID"] == trip_id, "Manual Priority"] = manual_priority
-                    else:
-                        new_row = pd.DataFrame([{"Trip ID": trip_id, "Manual Priority": manual_priority}])
-                        st.session_state.df_overrides = pd.concat([st.session_state.df_overrides, new_row], ignore_index=True)
-                
-                # Remove rows with empty manual priority
-                st.session_state.df_overrides = st.session_state.df_overrides[st.session_state.df_overrides["Manual Priority"].isin(ALLOWED_LABELS)]
-
-                st.session_state.df_overrides.to_csv(overrides_file, index=False)
-                del st.session_state.pending_priority_platforms[platform]
-                st.experimental_rerun()
-
-            if col2.button(f"Disagree - Revert Changes for {platform}"):
-                if platform in st.session_state.pending_priority_platforms:
-                    del st.session_state.pending_priority_platforms[platform]
-                
+            if col1.button("Agree - Apply Priority Changes"):
+                override_map = st.session_state.overrides
+
+                # Only rows the user edited count; arriving trains are shown without their
+                # override, so they'd otherwise clear it. Append just those rows to the log.
+                changed_rows = edited_rows & (df_queues["Status"] != "Arriving").to_numpy()
+                changed = dict(zip(
+                    df_queues["Trip ID"].to_numpy()[changed_rows],
+                    edited_df["Manual Priority"].fillna("").to_numpy()[changed_rows]
+                ))
+                if changed:
+                    with open(overrides_file, "a", newline="") as f:
+                        csv.writer(f, lineterminator="\n").writerows(changed.items())
+
+                # Update the overrides, dropping any that were cleared
+                override_map.update(changed)
+                st.session_state.overrides = {
+                    trip_id: label for trip_id, label in override_map.items() if label in ALLOWED_LABELS
+                }
+
+                # The table is re-sorted with the new overrides, so drop the editor's row edits.
+                # A new key is needed too: if only arriving rows were edited the table is unchanged.
+                st.session_state.pop(data_editor_key, None)
+                st.session_state.revert_trigger += 1
+                st.rerun(scope="fragment")
+
+            if col2.button("Disagree - Revert Priority Changes"):
                 # Reload overrides from file to ensure the state is completely reset
-                if os.path.exists(overrides_file):
-                    st.session_state.df_overrides = pd.read_csv(overrides_file, dtype={"Trip ID": str})
-                    if "Manual Priority" not in st.session_state.df_overrides.columns:
-                        st.session_state.df_overrides["Manual Priority"] = ""
-                else:
-                    st.session_state.df_overrides = pd.DataFrame(columns=["Trip ID", "Manual Priority"])
-                
-                # Increment the trigger to force a UI reset
+                st.session_state.overrides, _ = load_overrides(overrides_file)
+
+                # Remount the editor under a new key so it redraws from the saved overrides
+                st.session_state.pop(data_editor_key, None)
                 st.session_state.revert_trigger += 1
-                
-                st.experimental_rerun()
\ No newline at end of file
+
+                st.rerun(scope="fragment")
+
+platform_queue_section()
@@ -1,6 +1,46 @@
 import pandas as pd
+import numpy as np
 import sys
 
+# Column dtypes for the two datasets. The integer columns are nullable, so a blank
+# cell reads as <NA> instead of failing the whole load.
+# (delay stays 64-bit: interactive_update_delays writes any integer the user types into it)
+TRAIN_DTYPES = {"Trip_ID": str, "Train_Name": "category", "priority": "Int32", "delay": "Int64",
+                "clearance_time": "Int32", "Platform_No": "Int16"}
+PLATFORM_DTYPES = {"Platform_ID": "category", "Line_ID": "category", "Is_Available": bool}
+
+def ranking_key(values):
+    """
+    Converts a ranking column to a float array for sorting.
+
+    Args:
+        values (pd.Series): A numeric column, possibly with missing values.
+
+    Returns:
+        np.ndarray: The values as floats, with missing values set to +inf so
+                    those trains rank last on this key.
+    """
+    keys = values.to_numpy(dtype='float64', na_value=np.nan)
+    return np.where(np.isnan(keys), np.inf, keys)
+
+def rank_trains(trains_df):
+    """
+    Ranks trains by Priority -> Delay (longest first) -> Clearance Time.
+
+    Args:
+        trains_df (pd.DataFrame): DataFrame of trains.
+
+    Returns:
+        np.ndarray: Row positions in ranked order. Trains that tie on all three
+                    keys keep their file order.
+    """
+    # lexsort ranks all three keys in one stable pass (last key is primary)
+    return np.lexsort((
+        ranking_key(trains_df['clearance_time']),
+        ranking_key(-trains_df['delay']),
+        ranking_key(trains_df['priority'])
+    ))
+
 def get_platform_queues(trains_df, platforms_df):
     """
     Sorts all trains based on priority rules and assigns them to a virtual queue
@@ -10,24 +50,18 @@ def get_platform_queues(trains_df, platforms_df):
         dict: A dictionary where keys are platform IDs and values are lists of
               dictionaries representing the trains in that platform's queue.
     """
-    queues = {}
-    
     # Sort all trains based on the defined rules: Priority -> Delay -> Clearance Time
-    sorted_trains = trains_df.sort_values(
-        by=['priority', 'delay', 'clearance_time'], 
-        ascending=[True, False, True]
-    )
+    sorted_trains = trains_df.iloc[rank_trains(trains_df)]
     
-    # Assign trains to platforms based on the `Platform_No` in the trains dataset
-    for i, train in sorted_trains.iterrows():
-        assigned_platform_id = f"Platform_{int(train['Platform_No'])}"
-        
-        if assigned_platform_id not in queues:
-            queues[assigned_platform_id] = []
-        
-        queues[assigned_platform_id].append(train.to_dict())
+    # Assign trains to platforms based on the `Platform_No` in the trains dataset.
+    # The IDs are built for the whole column at once, and groupby(sort=False) keeps
+    # the platforms in order of their first (highest-ranked) train.
+    assigned_platform_ids = "Platform_" + sorted_trains['Platform_No'].astype(int).astype(str)
 
-    return queues
+    return {
+        platform_id: queue.to_dict('records')
+        for platform_id, queue in sorted_trains.groupby(assigned_platform_ids.to_numpy(), sort=False)
+    }
 
 def get_recommendations_with_platforms(trains_df, platforms_df):
     """
@@ -41,22 +75,17 @@ def get_recommendations_with_platforms(trains_df, platforms_df):
         list: A list of tuples, where each tuple contains a recommended train (dict)
               and its suggested platform (dict).
     """
-    available_lines = platforms_df[platforms_df['Is_Available'] == True].to_dict('records')
-    trains_list = trains_df.to_dict('records')
+    # At most 10 lines are ever suggested, so don't keep more than that
+    available_lines = platforms_df.loc[platforms_df['Is_Available'].to_numpy()].head(10)
 
-    sorted_trains = sorted(trains_list, key=lambda train: (
-        train.get('priority', 0),
-        -train.get('delay', 0),
-        train.get('clearance_time', 0)
-    ))
+    num_suggestions = min(len(trains_df), len(available_lines))
 
-    num_suggestions = min(len(sorted_trains), len(available_lines), 10)
-    
-    recommendations = []
-    for i in range(num_suggestions):
-        recommendations.append((sorted_trains[i], available_lines[i]))
-        
-    return recommendations
+    # Rank with a stable sort so trains that tie on every key keep their file order
+    top_trains = trains_df.iloc[rank_trains(trains_df)[:num_suggestions]]
+    top_lines = available_lines.head(num_suggestions)
+
+    # Only the rows that are actually recommended are converted to dicts
+    return list(zip(top_trains.to_dict('records'), top_lines.to_dict('records')))
 
 def recommend_next_train(trains_df, platforms_df):
     """
@@ -69,20 +98,26 @@ def recommend_next_train(trains_df, platforms_df):
     Returns:
         tuple: (recommended_train_dict, assigned_platform_dict)
     """
-    available_lines = platforms_df[platforms_df['Is_Available'] == True]
+    # Positions of the available lines, straight from the bool column
+    available_idx = np.flatnonzero(platforms_df['Is_Available'].to_numpy())
     
-    if available_lines.empty or trains_df.empty:
+    if len(available_idx) == 0 or trains_df.empty:
         return None, None
 
-    trains_list = trains_df.to_dict('records')
-    sorted_trains = sorted(trains_list, key=lambda train: (
-        train['priority'],
-        -train['delay'],
-        train['clearance_time']
-    ))
+    # Only the single best train is needed, so narrow the candidates one key at a
+    # time instead of sorting: Priority -> Delay (longest first) -> Clearance Time.
+    # argmin returns the first match, so ties keep their original order.
+    priority = ranking_key(trains_df['priority'])
+    neg_delay = ranking_key(-trains_df['delay'])
+    clearance_time = ranking_key(trains_df['clearance_time'])
+
+    candidates = np.flatnonzero(priority == priority.min())
+    candidates = candidates[neg_delay[candidates] == neg_delay[candidates].min()]
+    best = candidates[np.argmin(clearance_time[candidates])]
     
-    top_recommendation = sorted_trains[0]
-    assigned_line = available_lines.iloc[0].to_dict()
+    # Only the recommended row is converted to a dict
+    top_recommendation = trains_df.iloc[[best]].to_dict('records')[0]
+    assigned_line = platforms_df.iloc[available_idx[:1]].to_dict('records')[0]
     
     return top_recommendation, assigned_line
 
@@ -98,13 +133,20 @@ def interactive_update_delays(df):
     """
     print("\n--- Current Train Delays ---")
     print(df[['Trip_ID', 'Train_Name', 'delay']].head(10))  # Show top rows for context
+
+    # Map each Trip_ID to its row positions once, so every edit is a direct write
+    # instead of a scan over the whole column
+    row_positions = {}
+    for i, trip_id in enumerate(df['Trip_ID'].to_numpy()):
+        row_positions.setdefault(trip_id, []).append(i)
+    delay_col = df.columns.get_loc('delay')
     
     while True:
         train_id = input("\nEnter the Trip_ID of the train to update (or 'q' to quit): ").strip()
         if train_id.lower() == 'q':
             break
 
-        if train_id not in df['Trip_ID'].values:
+        if train_id not in row_positions:
             print("❌ Error: Trip_ID not found. Please try again.")
             continue
 
@@ -115,23 +157,22 @@ def interactive_update_delays(df):
             continue
 
         # Update the DataFrame
-        df.loc[df['Trip_ID'] == train_id, 'delay'] = new_delay
+        df.iloc[row_positions[train_id], delay_col] = new_delay
         print(f"✅ Updated delay for {train_id} to {new_delay} seconds.")
         
     return df
 
-def run_simulation(trains_filepath, platforms_filepath, df_trains_updated):
-    """
-    Main function to load data and run the simulation.
+def run_simulation(df_trains_updated, df_platforms):
     """
-    try:
-        df_platforms = pd.read_csv(platforms_filepath)
-    except FileNotFoundError as e:
-        print(f"❌ Error: Could not find the file '{e.filename}'.")
-        return
+    Main function to run the simulation on already loaded data.
 
+    Args:
+        df_trains_updated (pd.DataFrame): DataFrame of trains, with any delay updates applied.
+        df_platforms (pd.DataFrame): DataFrame of platform and line statuses.
+    """
     print("\n--- 🚂 Section Controller AI ---")
-    print(f"Ranking {len(df_trains_updated)} trains against {len(df_platforms[df_platforms['Is_Available'] == True])} available platform lines.")
+    num_available = int(df_platforms['Is_Available'].to_numpy().sum())
+    print(f"Ranking {len(df_trains_updated)} trains against {num_available} available platform lines.")
     print("---------------------------------")
 
     full_recommendations = get_recommendations_with_platforms(df_trains_updated, df_platforms)
@@ -153,9 +194,12 @@ if __name__ == "__main__":
     platform_data_file = "platform_dataset.csv"
 
     try:
-        df_trains_original = pd.read_csv(train_data_file)
+        # Both files are read once up front, so a missing file is reported
+        # before the user starts entering delays
+        df_trains_original = pd.read_csv(train_data_file, dtype=TRAIN_DTYPES)
+        df_platforms = pd.read_csv(platform_data_file, dtype=PLATFORM_DTYPES)
         df_trains_updated = interactive_update_delays(df_trains_original.copy())
-        run_simulation(train_data_file, platform_data_file, df_trains_updated)
+        run_simulation(df_trains_updated, df_platforms)
 
     except FileNotFoundError as e:
         print(f"❌ Error: The file '{e.filename}' was not found.")